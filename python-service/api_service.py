@@ -5,21 +5,26 @@ Provides REST API endpoints for the Arabic Text Cleaner web application.
 """
 
 import os
+import secrets
 import tempfile
+import time
 import shutil
 import logging
-from typing import List, Dict, Optional, Union
+import multiprocessing
+from typing import List, Dict, Optional, Tuple, Union
 from pathlib import Path
 import asyncio
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import aiofiles
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+import orjson
 from pydantic import BaseModel
 
-from document_chunker import DocumentChunker
+from document_chunker import DocumentChunker, warm_up_tokenizers
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -29,7 +34,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Document Chunking Service",
     description="API service for chunking large documents while preserving structure",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS for Next.js integration
@@ -55,6 +61,17 @@ chunker = DocumentChunker(chunk_size_words=default_chunk_size, overlap_words=def
 TEMP_DIR = Path(tempfile.gettempdir()) / "document_chunker"
 TEMP_DIR.mkdir(exist_ok=True)
 
+# Temp files awaiting cleanup in time order as (recorded_at, path), so cleanup only
+# visits expired entries. Requests delete their own files; only leftovers are recorded.
+TEMP_FILE_MAX_AGE_SECONDS = 3600
+temp_file_index: deque = deque()
+
+# Worker processes for CPU-bound chunking of multi-file uploads (created on startup)
+process_pool: Optional[ProcessPoolExecutor] = None
+
+# Read size used when streaming uploads to disk
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
 
 class ChunkingRequest(BaseModel):
     """Request model for chunking configuration."""
@@ -66,6 +83,7 @@ class ChunkingResponse(BaseModel):
     """Response model for chunking results."""
     success: bool
     file_name: str
+    file_size_bytes: Optional[int] = None
     file_size_mb: Optional[float] = None
     total_word_count: Optional[int] = None
     chunk_count: Optional[int] = None
@@ -84,6 +102,61 @@ class HealthResponse(BaseModel):
     version: str
 
 
+def _process_path(file_path: str, chunk_size_words: int, overlap_words: int,
+                  file_size: Optional[int] = None) -> Dict:
+    """Chunk a saved upload; runs inside a worker process."""
+    start_time = datetime.now()
+    # Each worker process has its own module-level chunker, reused across tasks.
+    # Workers skip the extraction cache so each one does not hold its own copy.
+    result = chunker.process_file(
+        file_path,
+        chunk_size_words=chunk_size_words,
+        overlap_words=overlap_words,
+        known_size=file_size,
+        use_cache=False
+    )
+    processing_time = (datetime.now() - start_time).total_seconds()
+    result['processing_time_seconds'] = round(processing_time, 2)
+    return result
+
+
+def _temp_upload_path(filename: str) -> Path:
+    """Build a unique temp path for an upload, keeping only the file's base name."""
+    return TEMP_DIR / f"temp_{time.time_ns()}_{secrets.token_hex(4)}_{Path(filename).name}"
+
+
+def _save_upload_sync(source, destination: Path) -> int:
+    """Copy an upload's spooled file object to disk, returning the bytes written."""
+    file_size = 0
+    source.seek(0)
+    with open(destination, 'wb') as temp_file:
+        while chunk := source.read(UPLOAD_CHUNK_SIZE):
+            temp_file.write(chunk)
+            file_size += len(chunk)
+    return file_size
+
+
+async def _save_upload(file: UploadFile, destination: Path) -> int:
+    """Stream an uploaded file to disk in a single thread pool handoff, returning its size."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, _save_upload_sync, file.file, destination)
+
+
+def _chunking_json(response: ChunkingResponse) -> ORJSONResponse:
+    """Serialize a ChunkingResponse with orjson, leaving out unset fields."""
+    return ORJSONResponse(content=response.model_dump(exclude_none=True))
+
+
+def _file_error_result(file: UploadFile, error: Exception) -> Dict:
+    """Per-file error entry for multi-file results."""
+    return {
+        "success": False,
+        "file_name": file.filename,
+        "error": str(error),
+        "error_type": type(error).__name__
+    }
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint."""
@@ -105,6 +178,7 @@ async def root():
         "endpoints": {
             "health": "/health",
             "chunk_file": "/chunk-file",
+            "chunk_file_stream": "/chunk-file-stream",
             "chunk_multiple": "/chunk-multiple",
             "supported_formats": "/supported-formats"
         }
@@ -155,32 +229,29 @@ async def chunk_single_file(
             )
         
         # Create temporary file
-        temp_file_path = TEMP_DIR / f"temp_{datetime.now().timestamp()}_{file.filename}"
+        temp_file_path = _temp_upload_path(file.filename)
         
         # Save uploaded file
-        async with aiofiles.open(temp_file_path, 'wb') as temp_file:
-            content = await file.read()
-            await temp_file.write(content)
-        
-        # Configure chunker
-        temp_chunker = DocumentChunker(
-            chunk_size_words=chunk_size_words,
-            overlap_words=overlap_words
-        )
+        file_size = await _save_upload(file, temp_file_path)
         
         # Process file
         logger.info(f"Processing file: {file.filename}")
-        result = temp_chunker.process_file(temp_file_path)
+        result = chunker.process_file(
+            temp_file_path,
+            chunk_size_words=chunk_size_words,
+            overlap_words=overlap_words,
+            known_size=file_size
+        )
         
         # Calculate processing time
         processing_time = (datetime.now() - start_time).total_seconds()
         result['processing_time_seconds'] = round(processing_time, 2)
-        
-        # Convert to response model
-        response = ChunkingResponse(**result)
+        # Report the uploaded name rather than the internal temp file name
+        result['file_name'] = file.filename
         
         logger.info(f"Successfully processed {file.filename} in {processing_time:.2f}s")
-        return response
+        
+        return _chunking_json(ChunkingResponse(**result))
         
     except HTTPException:
         raise
@@ -188,20 +259,86 @@ async def chunk_single_file(
         logger.error(f"Error processing file {file.filename}: {e}")
         processing_time = (datetime.now() - start_time).total_seconds()
         
-        return ChunkingResponse(
+        return _chunking_json(ChunkingResponse(
             success=False,
             file_name=file.filename,
             error=str(e),
             error_type=type(e).__name__,
             processing_time_seconds=round(processing_time, 2)
-        )
+        ))
     finally:
         # Clean up temporary file
-        if temp_file_path and temp_file_path.exists():
-            try:
-                temp_file_path.unlink()
-            except Exception as e:
-                logger.warning(f"Failed to delete temp file {temp_file_path}: {e}")
+        if temp_file_path:
+            _discard_temp_file(temp_file_path)
+
+
+@app.post("/chunk-file-stream", response_model=None)
+async def chunk_single_file_stream(
+    file: UploadFile = File(...),
+    chunk_size_words: int = 10000,
+    overlap_words: int = 100
+):
+    """
+    Chunk a single uploaded file, streaming chunks back as NDJSON.
+    
+    Each line of the response body is one chunk object, sent as soon as it
+    is produced, so large documents never hold every chunk in memory.
+    
+    Args:
+        file: The uploaded file to process
+        chunk_size_words: Target words per chunk (default: 10000)
+        overlap_words: Words to overlap between chunks (default: 100)
+    
+    Returns:
+        StreamingResponse of newline-delimited chunk objects, or a
+        ChunkingResponse describing the error if extraction fails
+    """
+    start_time = datetime.now()
+    temp_file_path = None
+    
+    # Validate file format
+    file_extension = Path(file.filename).suffix.lower()
+    if file_extension not in chunker.supported_formats:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file format: {file_extension}. "
+                   f"Supported formats: {list(chunker.supported_formats)}"
+        )
+    
+    try:
+        # Create temporary file
+        temp_file_path = _temp_upload_path(file.filename)
+        
+        # Save uploaded file
+        await _save_upload(file, temp_file_path)
+        
+        # Extract text up front so failures are reported before streaming starts
+        logger.info(f"Streaming chunks for file: {file.filename}")
+        text_content = chunker.extract_text_cached(temp_file_path)
+        if not text_content.strip():
+            raise Exception("No text content found in file")
+        
+    except Exception as e:
+        logger.error(f"Error processing file {file.filename}: {e}")
+        processing_time = (datetime.now() - start_time).total_seconds()
+        
+        return _chunking_json(ChunkingResponse(
+            success=False,
+            file_name=file.filename,
+            error=str(e),
+            error_type=type(e).__name__,
+            processing_time_seconds=round(processing_time, 2)
+        ))
+    finally:
+        # Clean up temporary file; the extracted text is all that is needed
+        if temp_file_path:
+            _discard_temp_file(temp_file_path)
+    
+    chunks = chunker.iter_chunks(text_content, chunk_size_words, overlap_words)
+    return StreamingResponse(
+        (orjson.dumps(chunk) + b"\n" for chunk in chunks),
+        media_type="application/x-ndjson"
+    )
 
 
 @app.post("/chunk-multiple")
@@ -227,26 +364,57 @@ async def chunk_multiple_files(
             detail="Too many files. Maximum 10 files per request."
         )
     
-    results = []
+    results: List[Optional[Dict]] = [None] * len(files)
+    temp_file_paths: Dict[int, Path] = {}
     
-    for file in files:
-        try:
-            result = await chunk_single_file(file, chunk_size_words, overlap_words)
-            results.append(result.dict())
-        except HTTPException as e:
-            results.append({
-                "success": False,
-                "file_name": file.filename,
-                "error": e.detail,
-                "error_type": "HTTPException"
-            })
-        except Exception as e:
-            results.append({
-                "success": False,
-                "file_name": file.filename,
-                "error": str(e),
-                "error_type": type(e).__name__
-            })
+    try:
+        # Validate formats and save supported uploads concurrently
+        for index, file in enumerate(files):
+            file_extension = Path(file.filename).suffix.lower()
+            if file_extension not in chunker.supported_formats:
+                results[index] = {
+                    "success": False,
+                    "file_name": file.filename,
+                    "error": f"Unsupported file format: {file_extension}. "
+                             f"Supported formats: {list(chunker.supported_formats)}",
+                    "error_type": "HTTPException"
+                }
+            else:
+                temp_file_paths[index] = _temp_upload_path(file.filename)
+        
+        save_outcomes = await asyncio.gather(*[
+            _save_upload(files[index], path) for index, path in temp_file_paths.items()
+        ], return_exceptions=True)
+        
+        # A failed save only fails that file
+        saved_files: Dict[int, Tuple[Path, int]] = {}
+        for (index, path), saved in zip(temp_file_paths.items(), save_outcomes):
+            if isinstance(saved, Exception):
+                logger.error(f"Error saving file {files[index].filename}: {saved}")
+                results[index] = _file_error_result(files[index], saved)
+            else:
+                saved_files[index] = (path, saved)
+        
+        # Chunk files in parallel across worker processes
+        loop = asyncio.get_running_loop()
+        outcomes = await asyncio.gather(*[
+            loop.run_in_executor(process_pool, _process_path, str(path), chunk_size_words,
+                                 overlap_words, file_size)
+            for path, file_size in saved_files.values()
+        ], return_exceptions=True)
+        
+        for index, outcome in zip(saved_files, outcomes):
+            file = files[index]
+            if isinstance(outcome, Exception):
+                logger.error(f"Error processing file {file.filename}: {outcome}")
+                results[index] = _file_error_result(file, outcome)
+            else:
+                outcome['file_name'] = file.filename
+                results[index] = outcome
+    finally:
+        # Clean up temporary files
+        for path in temp_file_paths.values():
+            _discard_temp_file(path)
     
     return {"results": results}
 
@@ -274,15 +442,11 @@ async def chunk_text_content(
         if not text or not text.strip():
             raise HTTPException(status_code=400, detail="Empty text content provided")
         
-        # Configure chunker
-        temp_chunker = DocumentChunker(
-            chunk_size_words=chunk_size_words,
-            overlap_words=overlap_words
-        )
-        
         # Process text
-        total_word_count = temp_chunker.count_words(text)
-        chunks = temp_chunker.chunk_text_with_structure_preservation(text)
+        total_word_count = chunker.count_words(text)
+        chunks = chunker.chunk_text_with_structure_preservation(
+            text, chunk_size_words, overlap_words
+        )
         
         processing_time = (datetime.now() - start_time).total_seconds()
         
@@ -313,16 +477,53 @@ async def chunk_text_content(
         }
 
 
+def _discard_temp_file(file_path: Path):
+    """Delete a request's temp file, leaving it to periodic cleanup if that fails."""
+    try:
+        file_path.unlink()
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Failed to delete temp file {file_path}: {e}")
+        temp_file_index.append((datetime.now().timestamp(), file_path))
+
+
+def _index_leftover_temp_files():
+    """Queue temp files left by earlier processes (e.g. after a crash) for cleanup by age."""
+    leftovers = []
+    for file_path in TEMP_DIR.iterdir():
+        try:
+            if file_path.is_file():
+                leftovers.append((file_path.stat().st_mtime, file_path))
+        except FileNotFoundError:
+            continue
+    leftovers.sort()
+    # Leftovers predate anything recorded from now on, so the index stays in time order
+    temp_file_index.extendleft(reversed(leftovers))
+    if leftovers:
+        logger.info(f"Queued {len(leftovers)} leftover temp files for cleanup")
+
+
+def _remove_temp_file(file_path: Path) -> bool:
+    """Delete a temp file, returning False if it was already gone."""
+    try:
+        file_path.unlink()
+        return True
+    except FileNotFoundError:
+        return False
+
+
 async def cleanup_temp_files():
     """Background task to clean up old temporary files."""
     try:
         current_time = datetime.now().timestamp()
-        for file_path in TEMP_DIR.iterdir():
-            if file_path.is_file():
-                # Delete files older than 1 hour
-                if current_time - file_path.stat().st_mtime > 3600:
-                    file_path.unlink()
+        while temp_file_index and current_time - temp_file_index[0][0] > TEMP_FILE_MAX_AGE_SECONDS:
+            _, file_path = temp_file_index.popleft()
+            try:
+                if await asyncio.to_thread(_remove_temp_file, file_path):
                     logger.info(f"Cleaned up old temp file: {file_path}")
+            except Exception as e:
+                logger.warning(f"Failed to delete temp file {file_path}: {e}")
     except Exception as e:
         logger.error(f"Error during temp file cleanup: {e}")
 
@@ -335,6 +536,30 @@ async def startup_event():
     # Ensure temp directory exists
     TEMP_DIR.mkdir(exist_ok=True)
     
+    # Pick up temp files a crashed or killed process never removed
+    try:
+        _index_leftover_temp_files()
+    except Exception as e:
+        logger.error(f"Error scanning temp directory: {e}")
+    
+    # Load NLTK data now rather than mid-request; refuse to start without it
+    try:
+        warm_up_tokenizers()
+    except LookupError as e:
+        logger.error(f"NLTK data missing, run start_service.py or download 'punkt': {e}")
+        raise
+    
+    # Start worker processes for multi-file chunking. Forking this threaded
+    # asyncio process could copy locks held by other threads, so workers are
+    # started from a clean forkserver (or spawned where that is unavailable).
+    global process_pool
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    process_pool = ProcessPoolExecutor(
+        max_workers=max(1, (os.cpu_count() or 2) - 1),
+        mp_context=multiprocessing.get_context(start_method),
+        initializer=warm_up_tokenizers
+    )
+    
     # Schedule periodic cleanup
     asyncio.create_task(periodic_cleanup())
     
@@ -353,6 +578,10 @@ async def shutdown_event():
     """Cleanup on service shutdown."""
     logger.info("Document Chunking Service shutting down...")
     
+    # Stop worker processes
+    if process_pool is not None:
+        process_pool.shutdown(wait=False, cancel_futures=True)
+    
     # Clean up all temp files
     try:
         shutil.rmtree(TEMP_DIR, ignore_errors=True)
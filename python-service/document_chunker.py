@@ -7,9 +7,16 @@ while preserving word boundaries and document structure.
 
 import os
 import re
+import sys
 import io
+import hashlib
 import logging
-from typing import List, Dict, Tuple, Optional, Union
+import mmap
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Iterator, List, Dict, Tuple, Optional, Union
 from pathlib import Path
 import tempfile
 
@@ -26,14 +33,16 @@ try:
 except ImportError:
     DocxDocument = None
 
+# Optional: vectorized word boundary detection for very large documents
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# NLTK data is downloaded by start_service.py / the Docker build, never at import
 try:
     import nltk
-    from nltk.tokenize import sent_tokenize, word_tokenize
-    # Download required NLTK data if not present
-    try:
-        nltk.data.find('tokenizers/punkt')
-    except LookupError:
-        nltk.download('punkt')
+    from nltk.tokenize import sent_tokenize
 except ImportError:
     nltk = None
 
@@ -41,6 +50,56 @@ except ImportError:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Precompiled patterns used on the chunking hot path. Arabic combining marks
+# (harakat etc.) are not \w, so they are added to keep vocalized words whole.
+# A greedy run is always bounded by word boundaries, so explicit \b anchors
+# are not needed.
+_WORD_RE = re.compile(r'[\w\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED]+', re.UNICODE)
+# Byte-level equivalent, only valid for pure-ASCII text; the added marks are
+# all non-ASCII, so it matches _WORD_RE on ASCII input
+_ASCII_WORD_RE = re.compile(rb'\w+')
+_SENT_RE = re.compile(r'[.!?]+\s+')
+_PARAGRAPH_RE = re.compile(r'[^\n]+(?:\n(?!\n)[^\n]+)*')
+
+# Number of words reported at each end of a chunk
+EDGE_WORD_COUNT = 10
+
+# Limits on extracted documents kept in memory, keyed by content hash
+EXTRACT_CACHE_SIZE = 32
+EXTRACT_CACHE_MAX_CHARS = 32 * 1024 * 1024
+# Larger documents are never cached
+EXTRACT_CACHE_MAX_ENTRY_CHARS = 8 * 1024 * 1024
+
+# Documents at least this many characters long locate words with NumPy when available
+NUMPY_TOKENIZE_MIN_CHARS = 1 << 20
+
+# Characters classified per NumPy pass, bounding the temporary arrays
+NUMPY_TOKENIZE_BLOCK_CHARS = 1 << 20
+
+
+def _count_word_matches(text: str) -> int:
+    """Count _WORD_RE matches in text."""
+    # str.isascii() is O(1); ASCII text can use the faster bytes pattern
+    if text.isascii():
+        return len(_ASCII_WORD_RE.findall(text.encode('ascii')))
+    return len(_WORD_RE.findall(text))
+
+
+def _whitespace_word_start(text: str, lower: int, position: int) -> int:
+    """Back up from position to the start of its whitespace-separated word, not past lower."""
+    while position > lower and not text[position - 1].isspace():
+        position -= 1
+    return position
+
+
+def _next_whitespace_word_start(text: str, position: int, upper: int) -> int:
+    """Skip forward from position to the start of the next whitespace-separated word, not past upper."""
+    while position < upper and not text[position].isspace():
+        position += 1
+    while position < upper and text[position].isspace():
+        position += 1
+    return position
+
 
 class DocumentChunker:
     """
@@ -49,17 +108,23 @@ class DocumentChunker:
     word boundaries and document structure.
     """
     
-    def __init__(self, chunk_size_words: int = 10000, overlap_words: int = 100):
+    def __init__(self, chunk_size_words: int = 10000, overlap_words: int = 100,
+                 min_chunk_words: int = 100):
         """
         Initialize the document chunker.
         
         Args:
             chunk_size_words: Target number of words per chunk
             overlap_words: Number of words to overlap between chunks for context
+            min_chunk_words: Final chunks with fewer new words are merged into
+                the previous chunk
         """
         self.chunk_size_words = chunk_size_words
         self.overlap_words = overlap_words
+        self.min_chunk_words = min_chunk_words
         self.supported_formats = {'.txt', '.pdf', '.docx'}
+        self._extract_cache: OrderedDict[str, str] = OrderedDict()
+        self._extract_cache_chars = 0
         
     def is_supported_format(self, file_path: Union[str, Path]) -> bool:
         """Check if the file format is supported."""
@@ -91,6 +156,39 @@ class DocumentChunker:
         else:
             raise ValueError(f"Unsupported file format: {extension}")
     
+    def extract_text_cached(self, file_path: Path) -> str:
+        """Extract text from a file, reusing the result for identical uploads."""
+        cache_key = f"{file_path.suffix.lower()}:{self._hash_file(file_path)}"
+        
+        if cache_key in self._extract_cache:
+            logger.info(f"Using cached text for {file_path}")
+            self._extract_cache.move_to_end(cache_key)
+            return self._extract_cache[cache_key]
+        
+        logger.info(f"Extracting text from {file_path}")
+        text_content = self.extract_text_from_file(file_path)
+        
+        if len(text_content) <= EXTRACT_CACHE_MAX_ENTRY_CHARS:
+            self._extract_cache[cache_key] = text_content
+            self._extract_cache_chars += len(text_content)
+            while (len(self._extract_cache) > EXTRACT_CACHE_SIZE
+                   or self._extract_cache_chars > EXTRACT_CACHE_MAX_CHARS):
+                _, evicted = self._extract_cache.popitem(last=False)
+                self._extract_cache_chars -= len(evicted)
+        
+        return text_content
+    
+    @staticmethod
+    def _hash_file(file_path: Path) -> str:
+        """Hash file contents with BLAKE2b, memory-mapping the file."""
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, 'rb') as file:
+            # mmap cannot map empty files
+            if os.fstat(file.fileno()).st_size:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    digest.update(mapped)
+        return digest.hexdigest()
+    
     def _extract_from_txt(self, file_path: Path) -> str:
         """Extract text from a plain text file."""
         try:
@@ -158,21 +256,16 @@ class DocumentChunker:
             raise Exception(f"Could not extract text from DOCX: {file_path}. Error: {e}")
     
     def count_words(self, text: str) -> int:
-        """Count words in text, handling various languages and formats."""
+        """
+        Count words in text, handling various languages and formats.
+        
+        Uses the Unicode word regex only; NLTK's word_tokenize produces every
+        punctuation token just to discard it, so it is not used for counting.
+        """
         if not text or not text.strip():
             return 0
         
-        # Use NLTK if available for better tokenization
-        if nltk:
-            try:
-                words = word_tokenize(text)
-                return len([word for word in words if word.isalnum()])
-            except:
-                pass
-        
-        # Fallback to simple regex-based counting
-        words = re.findall(r'\b\w+\b', text)
-        return len(words)
+        return _count_word_matches(text)
     
     def split_into_sentences(self, text: str) -> List[str]:
         """Split text into sentences using NLTK or fallback method."""
@@ -183,94 +276,396 @@ class DocumentChunker:
                 pass
         
         # Fallback sentence splitting
-        sentences = re.split(r'[.!?]+\s+', text)
+        sentences = _SENT_RE.split(text)
         return [s.strip() for s in sentences if s.strip()]
     
-    def chunk_text_with_structure_preservation(self, text: str) -> List[Dict[str, Union[str, int]]]:
+    def _word_starts(self, text: str) -> array:
+        """
+        Tokenize text in a single pass, returning the start offset of every word.
+        
+        Offsets are stored as a packed array of 64-bit integers rather than a
+        list of int objects, a fraction of the memory on large documents.
+        """
+        if np is not None and len(text) >= NUMPY_TOKENIZE_MIN_CHARS:
+            return _word_starts_vectorized(text)
+        return array('q', (match.start() for match in _WORD_RE.finditer(text)))
+    
+    def _iter_paragraphs(self, text: str) -> Iterator[Tuple[str, int, int]]:
+        """Lazily yield (paragraph, start, end) for blank-line separated paragraphs."""
+        for match in _PARAGRAPH_RE.finditer(text):
+            raw_paragraph = match.group()
+            paragraph = raw_paragraph.strip()
+            if paragraph:
+                start = match.start() + len(raw_paragraph) - len(raw_paragraph.lstrip())
+                yield paragraph, start, start + len(paragraph)
+    
+    def _sentence_spans(self, text: str, start: int, end: int) -> List[Tuple[int, int]]:
+        """Locate the sentences of text[start:end] as (start, end) offsets into text."""
+        segment = text[start:end]
+        sentence_starts = []
+        position = 0
+        for sentence in self.split_into_sentences(segment):
+            found = segment.find(sentence, position)
+            if found < 0:
+                # Sentence was altered by the tokenizer; let word-level splitting handle it
+                return [(start, end)]
+            sentence_starts.append(found)
+            position = found + len(sentence)
+        
+        if not sentence_starts:
+            return [(start, end)]
+        
+        # Each sentence runs up to the next one, keeping its closing punctuation
+        sentence_starts[0] = 0
+        sentence_starts.append(len(segment))
+        return [
+            (start + s_start, start + s_start + len(segment[s_start:s_end].rstrip()))
+            for s_start, s_end in zip(sentence_starts, sentence_starts[1:])
+        ]
+    
+    def _split_words(self, text: str, word_starts: array,
+                     start: int, end: int, first_word: int, end_word: int,
+                     max_words: int) -> Iterator[Tuple[int, int, int, int]]:
+        """
+        Split text[start:end] into runs of at most max_words words.
+        
+        Runs break at whitespace so whitespace-separated words stay intact,
+        unless a single such word holds more than max_words regex words.
+        """
+        while end_word - first_word > max_words:
+            split_word = first_word + max_words
+            split_char = word_starts[split_word]
+            
+            # Back up to the start of the whitespace-separated word containing split_word
+            boundary = _whitespace_word_start(text, start, split_char)
+            if boundary > start:
+                boundary_word = bisect_left(word_starts, boundary, first_word)
+                if boundary_word > first_word:
+                    split_word, split_char = boundary_word, boundary
+            
+            yield start, start + len(text[start:split_char].rstrip()), first_word, split_word
+            start, first_word = split_char, split_word
+        
+        yield start, end, first_word, end_word
+    
+    def _iter_pieces(self, text: str, word_starts: array,
+                     max_words: int) -> Iterator[Tuple[int, int, int, int, bool]]:
+        """
+        Yield (start, end, first_word, end_word, new_paragraph) pieces of at most max_words words.
+        
+        Splitting is hierarchical: paragraphs that fit are kept whole, larger
+        ones are split into sentences, and sentences that are still too long
+        into runs of words. Every level measures length with the document's
+        word index, so nothing is re-tokenized.
+        """
+        end_word = 0
+        for _, start, end in self._iter_paragraphs(text):
+            first_word = bisect_left(word_starts, start, end_word)
+            end_word = bisect_left(word_starts, end, first_word)
+            if end_word - first_word <= max_words:
+                yield start, end, first_word, end_word, True
+                continue
+            
+            new_paragraph = True
+            sentence_end_word = first_word
+            for sentence_start, sentence_end in self._sentence_spans(text, start, end):
+                sentence_first_word = bisect_left(word_starts, sentence_start, sentence_end_word)
+                sentence_end_word = bisect_left(word_starts, sentence_end, sentence_first_word)
+                for piece in self._split_words(text, word_starts, sentence_start, sentence_end,
+                                               sentence_first_word, sentence_end_word, max_words):
+                    yield (*piece, new_paragraph)
+                    new_paragraph = False
+    
+    def chunk_text_with_structure_preservation(self, text: str,
+                                               chunk_size_words: Optional[int] = None,
+                                               overlap_words: Optional[int] = None,
+                                               min_chunk_words: Optional[int] = None) -> List[Dict[str, Union[str, int]]]:
         """
         Split text into chunks while preserving structure and word boundaries.
         
         Args:
             text: Input text to be chunked
+            chunk_size_words: Target words per chunk (defaults to the instance setting)
+            overlap_words: Words to overlap between chunks (defaults to the instance setting)
+            min_chunk_words: A final chunk with fewer new words takes trailing
+                pieces from the previous chunk (defaults to the instance setting)
             
         Returns:
             List of dictionaries containing chunk information
         """
+        return list(self.iter_chunks(text, chunk_size_words, overlap_words, min_chunk_words))
+    
+    def iter_chunks(self, text: str, chunk_size_words: Optional[int] = None,
+                    overlap_words: Optional[int] = None,
+                    min_chunk_words: Optional[int] = None) -> Iterator[Dict[str, Union[str, int]]]:
+        """
+        Lazily yield chunks of text, one dictionary at a time.
+        
+        The document is tokenized once upfront and split hierarchically into
+        paragraphs, then sentences, then words, so that no piece exceeds the
+        chunk size. Pieces and overlaps are tracked as index ranges into that
+        single word list, so word counts are obtained by subtraction instead
+        of re-tokenizing.
+        
+        Only the final chunk is rebalanced: if it has fewer than
+        min_chunk_words new words, whole trailing pieces are moved into it
+        from the previous chunk, as long as neither chunk exceeds
+        chunk_size_words or drops below min_chunk_words. Chunks in the
+        middle of the document are left as packed.
+        
+        Args:
+            text: Input text to be chunked
+            chunk_size_words: Target words per chunk (defaults to the instance setting)
+            overlap_words: Words to overlap between chunks (defaults to the instance setting)
+            min_chunk_words: A final chunk with fewer new words takes trailing
+                pieces from the previous chunk (defaults to the instance setting)
+            
+        Yields:
+            Dictionaries containing chunk information
+        """
         if not text or not text.strip():
-            return []
+            return
+        
+        if chunk_size_words is None:
+            chunk_size_words = self.chunk_size_words
+        if overlap_words is None:
+            overlap_words = self.overlap_words
+        if min_chunk_words is None:
+            min_chunk_words = self.min_chunk_words
+        # Both chunks of a rebalanced pair must be able to reach the minimum
+        min_chunk_words = min(min_chunk_words, chunk_size_words // 2)
         
-        # Split text into paragraphs first
-        paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
-        if not paragraphs:
-            paragraphs = [text.strip()]
+        # Tokenize the whole document once
+        word_starts = self._word_starts(text)
         
-        chunks = []
-        current_chunk = ""
+        # Cap pieces so a piece plus the carried-over overlap still fits in a chunk
+        max_piece_words = max(1, chunk_size_words - overlap_words)
+        
+        # Alternating separator/text parts; the leading separator is dropped on join
+        current_parts = []
+        # (separator, start, end, first_word, end_word) of each piece after the overlap
+        current_pieces = []
         current_word_count = 0
+        # Words at the start of the current chunk repeated from the previous one
+        overlap_word_count = 0
         chunk_number = 1
+        # Word index range [chunk_first_word, chunk_end_word) covered by the current chunk
+        chunk_first_word = 0
+        chunk_end_word = 0
+        # Character offsets where the current chunk starts and its last piece ends
+        chunk_start_char = 0
+        chunk_end_char = 0
+        # First and most recent whitespace-separated words of the current chunk
+        first_words = []
+        last_words = deque(maxlen=EDGE_WORD_COUNT)
+        # The previous chunk is held back so an undersized final chunk can be rebalanced
+        pending_chunk = None
+        pending_pieces = []
+        pending_first_word = 0
+        pending_start_char = 0
         
-        for paragraph in paragraphs:
-            paragraph_word_count = self.count_words(paragraph)
+        for start, end, first_word, end_word, new_paragraph in self._iter_pieces(
+            text, word_starts, max_piece_words
+        ):
+            piece = text[start:end]
+            separator = "\n\n" if new_paragraph else text[chunk_end_char:start]
+            piece_word_count = end_word - first_word
             
-            # If adding this paragraph would exceed chunk size
-            if current_word_count + paragraph_word_count > self.chunk_size_words and current_chunk:
+            # If adding this piece would exceed chunk size
+            if current_word_count + piece_word_count > chunk_size_words and current_parts:
                 # Finalize current chunk
-                chunks.append({
-                    'chunk_number': chunk_number,
-                    'content': current_chunk.strip(),
-                    'word_count': current_word_count,
-                    'start_words': current_chunk.strip().split()[:10] if current_chunk.strip() else [],
-                    'end_words': current_chunk.strip().split()[-10:] if current_chunk.strip() else []
-                })
+                if pending_chunk:
+                    yield self._build_chunk(*pending_chunk)
+                pending_chunk = (chunk_number, current_parts, current_word_count, first_words, last_words)
+                pending_pieces = current_pieces
+                pending_first_word = chunk_first_word
+                pending_start_char = chunk_start_char
+                current_pieces = []
                 
                 # Start new chunk with overlap if configured
-                if self.overlap_words > 0 and current_chunk:
-                    overlap_text = self._get_overlap_text(current_chunk, self.overlap_words)
-                    current_chunk = overlap_text + "\n\n" + paragraph
-                    current_word_count = self.count_words(overlap_text) + paragraph_word_count
+                first_words = []
+                last_words = deque(maxlen=EDGE_WORD_COUNT)
+                overlap = self._overlap_range(
+                    text, word_starts, chunk_start_char, chunk_first_word,
+                    chunk_end_char, chunk_end_word, overlap_words,
+                    chunk_size_words - piece_word_count
+                )
+                if overlap:
+                    chunk_start_char, chunk_first_word = overlap
+                    overlap_text = text[chunk_start_char:chunk_end_char]
+                    current_parts = ["", overlap_text]
+                    overlap_word_count = chunk_end_word - chunk_first_word
+                    self._track_edge_words(overlap_text, first_words, last_words)
                 else:
-                    current_chunk = paragraph
-                    current_word_count = paragraph_word_count
+                    current_parts = []
+                    overlap_word_count = 0
+                    chunk_start_char, chunk_first_word = start, first_word
                 
+                current_word_count = overlap_word_count
                 chunk_number += 1
-            else:
-                # Add paragraph to current chunk
-                if current_chunk:
-                    current_chunk += "\n\n" + paragraph
-                else:
-                    current_chunk = paragraph
-                current_word_count += paragraph_word_count
-        
-        # Add final chunk if there's remaining content
-        if current_chunk.strip():
-            chunks.append({
-                'chunk_number': chunk_number,
-                'content': current_chunk.strip(),
-                'word_count': current_word_count,
-                'start_words': current_chunk.strip().split()[:10],
-                'end_words': current_chunk.strip().split()[-10:]
-            })
-        
-        return chunks
+            elif not current_parts:
+                chunk_start_char, chunk_first_word = start, first_word
+            
+            # Add piece to current chunk
+            current_parts += (separator, piece)
+            current_pieces.append((separator, start, end, first_word, end_word))
+            current_word_count += piece_word_count
+            self._track_edge_words(piece, first_words, last_words)
+            chunk_end_word = end_word
+            chunk_end_char = end
+        
+        if pending_chunk and current_word_count - overlap_word_count < min_chunk_words:
+            rebalanced = self._rebalance_tail(
+                text, word_starts, pending_chunk, pending_pieces, pending_first_word,
+                pending_start_char, current_parts, current_word_count, overlap_word_count,
+                chunk_size_words, overlap_words, min_chunk_words
+            )
+            if rebalanced:
+                pending_chunk, (current_parts, current_word_count, first_words, last_words) = rebalanced
+        
+        if pending_chunk:
+            yield self._build_chunk(*pending_chunk)
+        if current_parts:
+            yield self._build_chunk(
+                chunk_number, current_parts, current_word_count, first_words, last_words
+            )
+    
+    def _rebalance_tail(self, text: str, word_starts: array, previous_chunk: Tuple,
+                        previous_pieces: List[Tuple[str, int, int, int, int]], previous_first_word: int,
+                        previous_start_char: int, tail_parts: List[str], tail_word_count: int, tail_overlap_word_count: int,
+                        chunk_size_words: int, overlap_words: int, min_chunk_words: int) -> Optional[Tuple]:
+        """
+        Move whole trailing pieces of the previous chunk into an undersized final chunk.
+        
+        Returns the rebuilt previous chunk arguments for _build_chunk and the
+        tail's (parts, word_count, first_words, last_words), or None when no
+        piece can move without breaking chunk_size_words or min_chunk_words.
+        """
+        chunk_number, previous_parts, previous_word_count = previous_chunk[:3]
+        tail_new_words = tail_word_count - tail_overlap_word_count
+        # The tail's own pieces, without the overlap it currently starts with
+        tail_own_parts = tail_parts[2:] if tail_overlap_word_count else tail_parts
+        
+        moved = 0
+        while tail_new_words < min_chunk_words and moved < len(previous_pieces) - 1:
+            _, _, _, first_word, end_word = previous_pieces[-1 - moved]
+            piece_word_count = end_word - first_word
+            # The tail's recomputed overlap is at most overlap_words
+            if (previous_word_count - piece_word_count < min_chunk_words
+                    or overlap_words + tail_new_words + piece_word_count > chunk_size_words):
+                break
+            previous_word_count -= piece_word_count
+            tail_new_words += piece_word_count
+            moved += 1
+        
+        if not moved:
+            return None
+        
+        remaining_pieces = previous_pieces[:-moved]
+        previous_parts = previous_parts[:-2 * moved]
+        
+        # Recompute the tail's overlap from the end of the shortened previous chunk
+        _, _, previous_end_char, _, previous_end_word = remaining_pieces[-1]
+        overlap = self._overlap_range(
+            text, word_starts, previous_start_char, previous_first_word,
+            previous_end_char, previous_end_word, overlap_words,
+            chunk_size_words - tail_new_words
+        )
+        new_tail_parts = []
+        tail_overlap_word_count = 0
+        if overlap:
+            overlap_start_char, overlap_first_word = overlap
+            new_tail_parts = ["", text[overlap_start_char:previous_end_char]]
+            tail_overlap_word_count = previous_end_word - overlap_first_word
+        for separator, start, end, _, _ in previous_pieces[-moved:]:
+            new_tail_parts += (separator, text[start:end])
+        new_tail_parts += tail_own_parts
+        
+        previous_first_words, previous_last_words = self._edge_words(previous_parts)
+        tail_first_words, tail_last_words = self._edge_words(new_tail_parts)
+        return (
+            (chunk_number, previous_parts, previous_word_count, previous_first_words, previous_last_words),
+            (new_tail_parts, tail_overlap_word_count + tail_new_words, tail_first_words, tail_last_words)
+        )
     
-    def _get_overlap_text(self, text: str, overlap_words: int) -> str:
-        """Get the last N words from text for overlap."""
-        words = text.split()
-        if len(words) <= overlap_words:
-            return text
-        return ' '.join(words[-overlap_words:])
+    def _overlap_range(self, text: str, word_starts: array,
+                       chunk_start_char: int, chunk_first_word: int,
+                       chunk_end_char: int, chunk_end_word: int,
+                       overlap_words: int, max_overlap_words: int) -> Optional[Tuple[int, int]]:
+        """
+        Locate the overlap carried from the end of a chunk into the next one.
+        
+        The overlap starts at a whitespace boundary so it never begins inside
+        a word such as "don't" or a vocalized Arabic word; backing up to that
+        boundary can add words, so if it would exceed max_overlap_words the
+        cut word is skipped instead.
+        
+        Returns:
+            (start_char, first_word) of the overlap, or None if there is none
+        """
+        overlap_words = min(overlap_words, max_overlap_words)
+        overlap_first_word = max(chunk_first_word, chunk_end_word - overlap_words)
+        if overlap_words <= 0 or overlap_first_word >= chunk_end_word:
+            return None
+        
+        cut_char = word_starts[overlap_first_word]
+        start_char = _whitespace_word_start(text, chunk_start_char, cut_char)
+        first_word = bisect_left(word_starts, start_char, chunk_first_word, overlap_first_word)
+        if chunk_end_word - first_word > overlap_words:
+            start_char = _next_whitespace_word_start(text, cut_char, chunk_end_char)
+            first_word = bisect_left(word_starts, start_char, overlap_first_word, chunk_end_word)
+            if first_word >= chunk_end_word:
+                return None
+        
+        return start_char, first_word
     
-    def process_file(self, file_path: Union[str, Path]) -> Dict[str, Union[str, int, List]]:
+    def _edge_words(self, parts: List[str]) -> Tuple[List[str], deque]:
+        """Collect the edge words of a chunk from its separator/text parts."""
+        first_words = []
+        last_words = deque(maxlen=EDGE_WORD_COUNT)
+        for part in parts[1::2]:
+            self._track_edge_words(part, first_words, last_words)
+        return first_words, last_words
+    
+    def _track_edge_words(self, part: str, first_words: List[str], last_words: deque):
+        """Record a part's leading and trailing words without splitting all of it."""
+        if len(first_words) < EDGE_WORD_COUNT:
+            first_words.extend(part.split(None, EDGE_WORD_COUNT)[:EDGE_WORD_COUNT - len(first_words)])
+        last_words.extend(part.rsplit(None, EDGE_WORD_COUNT)[-EDGE_WORD_COUNT:])
+    
+    def _build_chunk(self, chunk_number: int, parts: List[str], word_count: int,
+                     first_words: List[str], last_words: deque) -> Dict[str, Union[str, int]]:
+        """Join buffered separator/text parts into a finalized chunk dictionary."""
+        return {
+            'chunk_number': chunk_number,
+            'content': "".join(parts[1:]),
+            'word_count': word_count,
+            'start_words': first_words,
+            'end_words': list(last_words)
+        }
+    
+    def process_file(self, file_path: Union[str, Path], chunk_size_words: Optional[int] = None,
+                     overlap_words: Optional[int] = None,
+                     known_size: Optional[int] = None,
+                     use_cache: bool = True) -> Dict[str, Union[str, int, List]]:
         """
         Process a file and return chunked content with metadata.
         
         Args:
             file_path: Path to the file to process
+            chunk_size_words: Target words per chunk (defaults to the instance setting)
+            overlap_words: Words to overlap between chunks (defaults to the instance setting)
+            known_size: File size in bytes if already known, avoiding a stat() call
+            use_cache: Reuse and store extracted text in the extraction cache
             
         Returns:
             Dictionary containing processing results and metadata
         """
         file_path = Path(file_path)
+        if chunk_size_words is None:
+            chunk_size_words = self.chunk_size_words
+        if overlap_words is None:
+            overlap_words = self.overlap_words
         
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
@@ -280,19 +675,23 @@ class DocumentChunker:
         
         try:
             # Extract text content
-            logger.info(f"Extracting text from {file_path}")
-            text_content = self.extract_text_from_file(file_path)
+            if use_cache:
+                text_content = self.extract_text_cached(file_path)
+            else:
+                text_content = self.extract_text_from_file(file_path)
             
             if not text_content.strip():
                 raise Exception("No text content found in file")
             
             # Get file metadata
-            file_size = file_path.stat().st_size
+            file_size = known_size if known_size is not None else file_path.stat().st_size
             total_word_count = self.count_words(text_content)
             
             # Chunk the content
-            logger.info(f"Chunking text into {self.chunk_size_words}-word chunks")
-            chunks = self.chunk_text_with_structure_preservation(text_content)
+            logger.info(f"Chunking text into {chunk_size_words}-word chunks")
+            chunks = self.chunk_text_with_structure_preservation(
+                text_content, chunk_size_words, overlap_words
+            )
             
             return {
                 'success': True,
@@ -303,8 +702,8 @@ class DocumentChunker:
                 'chunk_count': len(chunks),
                 'chunks': chunks,
                 'processing_info': {
-                    'chunk_size_words': self.chunk_size_words,
-                    'overlap_words': self.overlap_words,
+                    'chunk_size_words': chunk_size_words,
+                    'overlap_words': overlap_words,
                     'format': file_path.suffix.lower()
                 }
             }
@@ -319,10 +718,53 @@ class DocumentChunker:
             }
 
 
+@lru_cache(maxsize=1)
+def _word_char_table():
+    """Lookup table marking every code point matched by _WORD_RE."""
+    table = np.zeros(sys.maxunicode + 1, dtype=bool)
+    all_chars = ''.join(map(chr, range(sys.maxunicode + 1)))
+    for match in _WORD_RE.finditer(all_chars):
+        table[match.start():match.end()] = True
+    return table
+
+
+def _word_starts_vectorized(text: str) -> array:
+    """
+    Locate word start offsets with NumPy instead of a per-word regex loop.
+    
+    Code points are classified through a lookup table built from _WORD_RE,
+    so results match the regex exactly; a word starts wherever the mask
+    turns on. The text is processed in NUMPY_TOKENIZE_BLOCK_CHARS blocks so
+    the temporary arrays stay bounded; each block carries the previous
+    block's last mask value so words spanning a boundary are not split.
+    """
+    table = _word_char_table()
+    word_starts = array('q')
+    previous = np.int8(0)
+    for offset in range(0, len(text), NUMPY_TOKENIZE_BLOCK_CHARS):
+        block = text[offset:offset + NUMPY_TOKENIZE_BLOCK_CHARS]
+        code_points = np.frombuffer(block.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+        is_word_char = table[code_points].view(np.int8)
+        transitions = np.diff(is_word_char, prepend=previous)
+        word_starts.frombytes((np.flatnonzero(transitions == 1) + offset).astype(np.int64, copy=False).tobytes())
+        previous = is_word_char[-1]
+    return word_starts
+
+
+def warm_up_tokenizers():
+    """
+    Load NLTK's Punkt sentence tokenizer ahead of the first request.
+    
+    Raises:
+        LookupError: If NLTK is installed but the punkt data is missing
+    """
+    if nltk:
+        nltk.data.find('tokenizers/punkt')
+        sent_tokenize("Warm up.")
+
+
 def main():
     """Example usage of the DocumentChunker."""
-    import sys
-    
     if len(sys.argv) != 2:
         print("Usage: python document_chunker.py <file_path>")
         sys.exit(1)
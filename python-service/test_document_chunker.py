@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for DocumentChunker chunk boundaries.
+"""
+
+import random
+
+import pytest
+
+import document_chunker
+from document_chunker import DocumentChunker
+
+VOCALIZED_ARABIC = "كَتَبَ الطَّالِبُ الدَّرْسَ فِي الْمَدْرَسَةِ وَقَرَأَ الْكِتَابَ"
+CONTRACTIONS = "don't stop, foo-bar costs 3.14 and it's the user's turn"
+
+
+def _is_token_run(tokens, run):
+    """Check that run appears as a contiguous slice of tokens."""
+    return any(tokens[i:i + len(run)] == run for i in range(len(tokens) - len(run) + 1))
+
+
+def test_overlap_never_starts_inside_a_word():
+    """Overlaps start at whitespace, even where regex words split a whitespace word."""
+    paragraphs = [f"{VOCALIZED_ARABIC} {index}. {CONTRACTIONS}." for index in range(40)]
+    text = "\n\n".join(paragraphs)
+    tokens = text.split()
+
+    chunks = DocumentChunker(60, 5, 0).chunk_text_with_structure_preservation(text)
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        words = chunk['content'].split()
+        assert _is_token_run(tokens, words)
+        assert chunk['start_words'] == words[:10]
+        assert chunk['end_words'] == words[-10:]
+
+
+def test_vocalized_arabic_words_count_once():
+    """Harakat do not split a word into several counted words."""
+    chunker = DocumentChunker()
+
+    assert chunker.count_words("كَتَبَ") == 1
+    assert chunker.count_words(VOCALIZED_ARABIC) == 7
+    assert chunker.count_words("كتب الطالب الدرس") == 3
+
+    chunks = chunker.chunk_text_with_structure_preservation(VOCALIZED_ARABIC)
+    assert chunks[0]['word_count'] == 7
+
+
+def test_vectorized_word_starts_match_regex(monkeypatch):
+    """Blockwise NumPy tokenizing finds the same words, including across block edges."""
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(document_chunker, "NUMPY_TOKENIZE_BLOCK_CHARS", 7)
+    text = "\n\n".join([VOCALIZED_ARABIC, CONTRACTIONS] * 20)
+
+    expected = [match.start() for match in document_chunker._WORD_RE.finditer(text)]
+    assert list(document_chunker._word_starts_vectorized(text)) == expected
+
+
+def _sample_document(seed):
+    """Paragraphs of mixed Arabic and English, some far longer than a chunk."""
+    rng = random.Random(seed)
+    vocabulary = VOCALIZED_ARABIC.split() + CONTRACTIONS.split() + ["مرحبا", "بالعالم،", "42"]
+    separators = [" ", " ", " ", "\t", "\r", "\xa0"]
+
+    paragraphs = []
+    for _ in range(rng.randint(5, 30)):
+        sentences = []
+        for _ in range(rng.randint(1, 12)):
+            words = [rng.choice(vocabulary) for _ in range(rng.randint(1, 40))]
+            separator = rng.choice(separators)
+            sentences.append(separator.join(words) + rng.choice([".", "!", "?", "؟", ""]))
+        paragraphs.append(" ".join(sentences))
+    return "\n\n".join(paragraphs)
+
+
+def _chunk_start(document_words, chunk_words, previous_end, overlap_words):
+    """Word index where a chunk starts, at most overlap_words before previous_end."""
+    for start in range(previous_end, max(0, previous_end - overlap_words) - 1, -1):
+        if document_words[start:start + len(chunk_words)] == chunk_words:
+            return start
+    return None
+
+
+@pytest.mark.parametrize("chunk_size_words,overlap_words", [
+    (200, 20), (100, 0), (100, 10), (50, 5), (40, 20),
+])
+@pytest.mark.parametrize("seed", range(10))
+def test_chunk_properties(seed, chunk_size_words, overlap_words):
+    """Chunks respect the size limit, cover every word in order and report accurate metadata."""
+    text = _sample_document(seed)
+    chunker = DocumentChunker(chunk_size_words, overlap_words)
+    document_words = document_chunker._WORD_RE.findall(text)
+
+    chunks = chunker.chunk_text_with_structure_preservation(text)
+
+    previous_end = 0
+    for chunk in chunks:
+        content = chunk['content']
+        chunk_words = document_chunker._WORD_RE.findall(content)
+        whitespace_words = content.split()
+
+        assert chunk['word_count'] <= chunk_size_words
+        assert chunk['word_count'] == chunker.count_words(content) == len(chunk_words)
+        assert chunk['start_words'] == whitespace_words[:10]
+        assert chunk['end_words'] == whitespace_words[-10:]
+
+        start = _chunk_start(document_words, chunk_words, previous_end, overlap_words)
+        assert start is not None
+        previous_end = start + len(chunk_words)
+
+    assert previous_end == len(document_words)
+
+
+def test_long_runs_split_at_any_whitespace():
+    """Word runs split at carriage returns and no-break spaces, not inside words."""
+    for separator in ("\r", "\xa0"):
+        text = separator.join(CONTRACTIONS.split() * 30)
+        tokens = text.split()
+
+        chunks = DocumentChunker(25, 0).chunk_text_with_structure_preservation(text)
+
+        assert len(chunks) > 1
+        for chunk in chunks:
+            assert _is_token_run(tokens, chunk['content'].split())